@@ -1,11 +1,22 @@
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_restful import Api, Resource
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_caching import Cache
-from uuid import uuid4, UUID
+from sqlalchemy import event, insert, lambda_stmt, select, update
+from sqlalchemy.orm import raiseload
+from sqlalchemy.pool import StaticPool
+from uuid import UUID, uuid4
+from werkzeug.http import quote_etag
 from models import db, Flight, Passenger
+from schemas import FlightIn, PassengerIn
 from datetime import datetime
+from itertools import chain
+import os
+import re
+import orjson
+import msgspec
 
 
 # Importing db and models
@@ -13,11 +24,47 @@ from models import db, Flight, Passenger
 
 
 
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, which handles datetime and UUID natively."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=str).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///flight.db'
+app.json = ORJSONProvider(app)
+DEVELOPMENT = os.environ.get('FLASK_ENV') == 'development'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///flight.db')
+if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    # SQLite connections may be used from the request thread that didn't open them
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'check_same_thread': False}, 'query_cache_size': 1200}
+    if ':memory:' in app.config['SQLALCHEMY_DATABASE_URI']:
+        # An in-memory database only exists on its connection, so share a single one
+        app.config['SQLALCHEMY_ENGINE_OPTIONS']['poolclass'] = StaticPool
+else:
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        # Per worker process: WEB_CONCURRENCY * (pool_size + max_overflow) must stay under the
+        # server's max_connections (100 by default on PostgreSQL); the defaults give 4 * 10 = 40.
+        # gunicorn.conf.py caps each gevent worker's concurrent requests at the same total
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 5)),
+        # A request that still finds the pool exhausted fails after this many seconds rather than
+        # holding its client for the 30s default; shorter means more 500s under bursts, longer
+        # means slower failures while the database is saturated
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': 1800,  # Reconnect before the server drops idle connections
+        'pool_pre_ping': True,  # Replace stale connections instead of failing the request
+        'query_cache_size': 1200,  # Room for every compiled statement the handlers use
+    }
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['CACHE_TYPE'] = 'simple'  # Set up caching
-cache = Cache(config={'CACHE_TYPE': 'SimpleCache'})  # Using the full path to backend classes directly
+# Set up caching: Redis is shared across workers, SimpleCache is the single-process fallback
+app.config['CACHE_TYPE'] = 'RedisCache' if os.environ.get('REDIS_URL') else 'SimpleCache'
+app.config['CACHE_REDIS_URL'] = os.environ.get('REDIS_URL')
+app.config['CACHE_KEY_PREFIX'] = 'flask_api_'
+cache = Cache()
 cache.init_app(app)
 
 
@@ -25,6 +72,62 @@ db.init_app(app)
 api = Api(app)
 migrate = Migrate(app, db)
 
+@api.representation('application/json')
+def output_json(data, code, headers=None):
+    """Serialize Resource return values with orjson instead of the stdlib json module."""
+    body = orjson.dumps(data, default=str)
+    return app.response_class(body, status=code, headers=headers, mimetype='application/json')
+
+# Cache invalidation: each cached model has a namespace whose version is part of every cache key.
+# Committing a write bumps that version (one INCR), so stale entries are never read again and
+# simply expire; the flight list needs no namespace since it is memoized on its ETag.
+CACHE_NAMESPACES = {Flight: 'flights', Passenger: 'passengers'}
+
+def namespaced_cache_key(namespace):
+    """make_cache_key for @cache.cached: the request path and query string under the namespace version."""
+    def make_cache_key(*args, **kwargs):
+        version = cache.get(f'{namespace}_version') or 0
+        return f'{namespace}/{version}{request.full_path}'
+    return make_cache_key
+
+def mark_namespaces_stale(session, model_classes):
+    stale = session.info.setdefault('stale_cache_namespaces', set())
+    stale.update(CACHE_NAMESPACES[cls] for cls in model_classes if cls in CACHE_NAMESPACES)
+
+@event.listens_for(db.session, 'after_flush')
+def mark_cache_stale(session, flush_context):
+    mark_namespaces_stale(session, {type(obj) for obj in chain(session.new, session.dirty, session.deleted)})
+
+@event.listens_for(db.session, 'do_orm_execute')
+def mark_cache_stale_on_bulk(orm_execute_state):
+    # Bulk UPDATE/DELETE statements skip the flush, so flag them here
+    mapper = orm_execute_state.bind_mapper
+    if not orm_execute_state.is_select and mapper is not None:
+        mark_namespaces_stale(orm_execute_state.session, {mapper.class_})
+
+@event.listens_for(db.session, 'after_commit')
+def invalidate_cache(session):
+    for namespace in session.info.pop('stale_cache_namespaces', ()):
+        cache.cache.inc(f'{namespace}_version')  # atomic INCR on Redis
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_cache_stale(session):
+    session.info.pop('stale_cache_namespaces', None)
+
+# N+1 detection: in development, or with RAISE_ON_LAZY_LOAD=1 (e.g. in CI), any lazy relationship
+# load that would emit SQL raises instead of silently running one query per row
+app.config['RAISE_ON_LAZY_LOAD'] = DEVELOPMENT or os.environ.get('RAISE_ON_LAZY_LOAD') == '1'
+
+@event.listens_for(db.session, 'do_orm_execute')
+def raise_on_lazy_load(orm_execute_state):
+    if (
+        app.config['RAISE_ON_LAZY_LOAD']
+        and orm_execute_state.is_select
+        and not orm_execute_state.is_relationship_load
+        and not orm_execute_state.is_column_load
+    ):
+        orm_execute_state.statement = orm_execute_state.statement.options(raiseload('*', sql_only=True))
+
 # Error handlers
 @app.errorhandler(404)
 def not_found_error(error):
@@ -34,67 +137,101 @@ def not_found_error(error):
 def internal_error(error):
     return jsonify({'message': 'An internal server error occurred.'}), 500
 
+# Helpers
+
+UUID_RE = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
+
+def valid_uuid(value):
+    """Check for a canonical hyphenated UUID string without building a UUID object."""
+    return isinstance(value, str) and UUID_RE.match(value) is not None
+
+# Column order matches Model.to_dict(); orjson renders the datetimes the same way isoformat() does
+FLIGHT_COLUMNS = ('id', 'created_at', 'deleted_at', 'flight_name', 'origin', 'destination', 'cost')
+PASSENGER_COLUMNS = ('id', 'created_at', 'deleted_at', 'name', 'email', 'checked_in', 'flight_id')
+
+# Hot-path statements built once; lambda_stmt caches their construction and cache key per call site
+FLIGHT_ATTRS = tuple(getattr(Flight, column) for column in FLIGHT_COLUMNS)
+PASSENGER_ATTRS = tuple(getattr(Passenger, column) for column in PASSENGER_COLUMNS)
+LIST_FLIGHTS = lambda_stmt(lambda: select(*FLIGHT_ATTRS))
+LIST_PASSENGERS = lambda_stmt(lambda: select(*PASSENGER_ATTRS).where(Passenger.deleted_at.is_(None)))
+
+def cacheable(rv):
+    """Only cache successful responses, never 404s or errors."""
+    return isinstance(rv, tuple) and rv[1] == 200
+
+def flights_etag():
+    """Validator for the flight list, derived from the committed flight table version."""
+    version, last_updated = Flight.table_version()
+    return f'{version}-{last_updated}'
+
+@cache.memoize(timeout=120)
+def list_flights(etag):
+    # Project the columns directly instead of hydrating full Flight objects
+    rows = db.session.execute(LIST_FLIGHTS).all()
+    return [dict(zip(FLIGHT_COLUMNS, row)) for row in rows]
+
+def stream_flights():
+    """Yield the flight list as NDJSON, fetching rows in batches so memory stays flat."""
+    rows = db.session.execute(LIST_FLIGHTS, execution_options={'yield_per': 500})
+    for row in rows:
+        yield orjson.dumps(dict(zip(FLIGHT_COLUMNS, row))) + b'\n'
+
 # Resources
 
 class FlightResource(Resource):
-    @cache.cached(timeout=120)
     def get(self, flight_id=None):
         try:
             if flight_id:
-                flight = db.session.get(Flight, str(flight_id))
-                if not flight:
-                    return {'message': 'Flight not found'}, 404
-                return flight.to_dict(), 200
-            else:
-                flights = Flight.query.all()
-                return [flight.to_dict() for flight in flights], 200
+                return self.get_flight(flight_id)
+
+            # ?stream=1 streams one JSON object per line instead of building the whole array
+            if request.args.get('stream') == '1':
+                return app.response_class(stream_with_context(stream_flights()), mimetype='application/x-ndjson')
+
+            # Conditional GET: repeat polls get a 304 until the flight table changes
+            etag = flights_etag()
+            headers = {'ETag': quote_etag(etag, weak=True)}
+            if request.if_none_match.contains_weak(etag):
+                return app.response_class(status=304, headers=headers)
+            return list_flights(etag), 200, headers
         except Exception as e:
             return {'message': f'An error occurred while fetching flights: {str(e)}'}, 500
 
+    @cache.cached(timeout=120, response_filter=cacheable, make_cache_key=namespaced_cache_key('flights'))
+    def get_flight(self, flight_id):
+        flight = db.session.get(Flight, flight_id)
+        if not flight:
+            return {'message': 'Flight not found'}, 404
+        return flight.to_dict(), 200
+
     def post(self):
-        data = request.get_json()
-
-        # Retrieve all fields from the request data
-        flight_id = data.get('id')
-        flight_name = data.get('flight_name')
-        origin = data.get('origin')
-        destination = data.get('destination')
-        cost = data.get('cost')
-        created_at = data.get('created_at')
-        deleted_at = data.get('deleted_at')
-
-        # Generate a new UUID if 'id' is not provided
-        if not flight_id:
-            flight_id = str(uuid4())
-
-        # Validate the provided 'id'
+        # Decode and validate the body in one pass; msgspec parses the ISO 8601 datetimes itself
         try:
-            flight_id = str(UUID(flight_id))  # Validate flight_id format
-        except ValueError:
+            payload = msgspec.json.decode(request.get_data(cache=False), type=FlightIn)
+        except msgspec.DecodeError as e:
+            return {'message': str(e)}, 400
+
+        # Generate a new UUID if 'id' is not provided, otherwise validate it
+        if not payload.id:
+            flight_id = uuid4()
+        elif not valid_uuid(payload.id):
             return {'message': 'Invalid flight ID format'}, 400
+        else:
+            flight_id = UUID(payload.id)  # Store the same UUID type the <uuid:...> routes pass in
 
-        # Check if all required fields are present
-        if not flight_name or not origin or not destination or cost is None:
+        # Check that the required text fields aren't empty
+        if not payload.flight_name or not payload.origin or not payload.destination:
             return {'message': 'All fields (flight_name, origin, destination, cost) are required.'}, 400
 
-        # Convert 'created_at' and 'deleted_at' to datetime objects if provided
-        try:
-            if created_at:
-                created_at = datetime.fromisoformat(created_at)
-            if deleted_at:
-                deleted_at = datetime.fromisoformat(deleted_at)
-        except ValueError:
-            return {'message': 'Invalid datetime format. Use ISO 8601 format.'}, 400
-
         # Create a new Flight instance
         flight = Flight(
             id=flight_id,
-            created_at=created_at,
-            deleted_at=deleted_at,
-            flight_name=flight_name,
-            origin=origin,
-            destination=destination,
-            cost=cost
+            created_at=payload.created_at,
+            deleted_at=payload.deleted_at,
+            flight_name=payload.flight_name,
+            origin=payload.origin,
+            destination=payload.destination,
+            cost=payload.cost
         )
 
         try:
@@ -108,36 +245,36 @@ class FlightResource(Resource):
 
 
 class PassengerResource(Resource):
-    @cache.cached(timeout=120, query_string=True)
+    @cache.cached(timeout=120, response_filter=cacheable, make_cache_key=namespaced_cache_key('passengers'))
     def get(self, passenger_id=None):
         try:
             if passenger_id:
-                passenger = db.session.get(Passenger, str(passenger_id))
+                passenger = db.session.get(Passenger, passenger_id)
                 if not passenger:
                     return {'message': 'Passenger not found'}, 404
                 return passenger.to_dict(), 200
             else:
-                passengers = Passenger.query.filter(Passenger.deleted_at.is_(None)).all()
-                return [passenger.to_dict() for passenger in passengers], 200
+                rows = db.session.execute(LIST_PASSENGERS).all()
+                return [dict(zip(PASSENGER_COLUMNS, row)) for row in rows], 200
         except Exception as e:
             return {'message': f'An error occurred while fetching passengers: {str(e)}'}, 500
 
 
     def post(self):
-        data = request.get_json()
-        flight_id = data.get('flight_id')
         try:
-            flight_id = str(UUID(flight_id))
-        except ValueError:
+            payload = msgspec.json.decode(request.get_data(cache=False), type=PassengerIn)
+        except msgspec.DecodeError as e:
+            return {'message': str(e)}, 400
+        if not valid_uuid(payload.flight_id):
             return {'message': 'Invalid flight ID format'}, 400
         
-        flight = Flight.query.filter_by(id=flight_id).first()
+        flight = db.session.get(Flight, UUID(payload.flight_id))
         if not flight:
             return {'message': 'Flight not found'}, 404
         
         passenger = Passenger(
-            name=data.get('name'),
-            email=data.get('email'),
+            name=payload.name,
+            email=payload.email,
             flight=flight,
         )
         db.session.add(passenger)
@@ -147,7 +284,7 @@ class PassengerResource(Resource):
 
     def put(self, passenger_id):
         try:
-            passenger = db.session.get(Passenger, str(passenger_id))
+            passenger = db.session.get(Passenger, passenger_id)
             if not passenger:
                 return {'message': 'Passenger not found'}, 404
             data = request.get_json()
@@ -163,15 +300,63 @@ class PassengerResource(Resource):
 
 
 
+class PassengerBatchResource(Resource):
+    def post(self):
+        try:
+            payloads = msgspec.json.decode(request.get_data(cache=False), type=list[PassengerIn])
+        except msgspec.DecodeError as e:
+            return {'message': str(e)}, 400
+        if not payloads:
+            return {'message': 'At least one passenger is required.'}, 400
+        if not all(valid_uuid(payload.flight_id) for payload in payloads):
+            return {'message': 'Invalid flight ID format'}, 400
+
+        # Check every referenced flight exists with one query
+        flight_ids = {UUID(payload.flight_id) for payload in payloads}
+        found = set(db.session.execute(select(Flight.id).where(Flight.id.in_(flight_ids))).scalars())
+        if found != flight_ids:
+            return {'message': 'Flight not found'}, 404
+
+        rows = [
+            {'id': uuid4(), 'name': payload.name, 'email': payload.email, 'flight_id': UUID(payload.flight_id)}
+            for payload in payloads
+        ]
+        try:
+            if db.engine.dialect.insert_executemany_returning:
+                # One multi-row INSERT ... RETURNING instead of an INSERT per passenger
+                created = db.session.execute(
+                    insert(Passenger).returning(*PASSENGER_ATTRS, sort_by_parameter_order=True), rows
+                ).all()
+            else:
+                # No RETURNING for executemany (e.g. MySQL): insert, then read the rows back in one query
+                db.session.execute(insert(Passenger), rows)
+                positions = {row['id']: i for i, row in enumerate(rows)}
+                created = sorted(
+                    db.session.execute(select(*PASSENGER_ATTRS).where(Passenger.id.in_(positions))).all(),
+                    key=lambda row: positions[row.id],
+                )
+            db.session.commit()
+            return [dict(zip(PASSENGER_COLUMNS, row)) for row in created], 201
+        except Exception as e:
+            db.session.rollback()
+            return {'message': f'An error occurred while creating passengers: {str(e)}'}, 500
+
+
 class PassengerSoftDeleteResource(Resource):
     def delete(self, passenger_id):
         try:
-            passenger = db.session.get(Passenger, str(passenger_id))
-            if not passenger:
-                return {'message': 'Passenger not found'}, 404
-            
-            passenger.soft_delete()
+            # Single UPDATE instead of loading the passenger first. RETURNING the row with
+            # populate_existing refreshes a copy already in the session, which never expires on commit.
+            updated = db.session.execute(
+                update(Passenger)
+                .where(Passenger.id == passenger_id, Passenger.deleted_at.is_(None))
+                .values(deleted_at=datetime.utcnow())
+                .returning(Passenger),
+                execution_options={'populate_existing': True},
+            ).scalar_one_or_none()
             db.session.commit()
+            if updated is None and not db.session.get(Passenger, passenger_id):
+                return {'message': 'Passenger not found'}, 404
             return {'message': 'Passenger soft deleted'}, 200
 
         except Exception as e:
@@ -182,15 +367,20 @@ class PassengerSoftDeleteResource(Resource):
 class PassengerRestoreResource(Resource):
     def patch(self, passenger_id):
         try:
-            passenger = db.session.get(Passenger, str(passenger_id))
-            if not passenger:
-                return {'message': 'Passenger not found'}, 404
-            
-            if passenger.deleted_at is None:
-                return {'message': 'Passenger is not soft deleted'}, 400
-            
-            passenger.restore()
+            # Single UPDATE instead of loading the passenger first, refreshing any in-session copy
+            updated = db.session.execute(
+                update(Passenger)
+                .where(Passenger.id == passenger_id, Passenger.deleted_at.isnot(None))
+                .values(deleted_at=None)
+                .returning(Passenger),
+                execution_options={'populate_existing': True},
+            ).scalar_one_or_none()
             db.session.commit()
+            if updated is None:
+                # Only look the passenger up to tell the two failure cases apart
+                if not db.session.get(Passenger, passenger_id):
+                    return {'message': 'Passenger not found'}, 404
+                return {'message': 'Passenger is not soft deleted'}, 400
             return {'message': 'Passenger restored'}, 200
 
         except Exception as e:
@@ -227,11 +417,12 @@ class CheapestRouteResource(Resource):
 # Add resources to the API
 api.add_resource(FlightResource, '/flights', '/flights/<uuid:flight_id>')
 api.add_resource(PassengerResource, '/passengers', '/passengers/<uuid:passenger_id>')
+api.add_resource(PassengerBatchResource, '/passengers/batch')
 api.add_resource(PassengerSoftDeleteResource, '/passengers/<uuid:passenger_id>/soft_delete')
 api.add_resource(PassengerRestoreResource, '/passengers/<uuid:passenger_id>/restore')
 api.add_resource(CheapestRouteResource, '/flights/cheapest_route')
 
 
-# Run the app
+# Run the development server; production runs wsgi:application under gunicorn (see Procfile)
 if __name__ == '__main__':
-    app.run(debug=True)
+    app.run(debug=DEVELOPMENT)
@@ -0,0 +1,24 @@
+# gunicorn settings used by the Procfile
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+
+# gevent only overlaps requests whose database calls yield. psycopg2 does once psycogreen
+# installs its wait callback; sqlite3 never does, so SQLite deployments use threads instead.
+if os.environ.get('DATABASE_URL', '').startswith('postgres'):
+    worker_class = 'gevent'
+    # Nearly every handler holds a database connection, so accept only as many concurrent
+    # requests as the worker's pool can serve (same settings as SQLALCHEMY_ENGINE_OPTIONS in
+    # app.py); more greenlets would just queue in the pool and time out. Raise
+    # DB_POOL_SIZE/DB_MAX_OVERFLOW together with WEB_CONCURRENCY within max_connections.
+    worker_connections = int(os.environ.get('DB_POOL_SIZE', 5)) + int(os.environ.get('DB_MAX_OVERFLOW', 5))
+else:
+    worker_class = 'gthread'
+    threads = int(os.environ.get('WEB_THREADS', 8))
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
@@ -0,0 +1,61 @@
+"""Use native UUID ids on PostgreSQL
+
+Revision ID: c7a3e58f0d21
+Revises: 9e2d6b4a1c57
+Create Date: 2026-10-14 11:48:13.402977
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7a3e58f0d21'
+down_revision = '9e2d6b4a1c57'
+branch_labels = None
+depends_on = None
+
+# GUID keeps the VARCHAR(36) storage on other databases, so only PostgreSQL needs converting
+UUID_COLUMNS = [
+    ('flight', 'id'),
+    ('layover', 'id'),
+    ('layover', 'flight_id'),
+    ('passenger', 'id'),
+    ('passenger', 'flight_id'),
+]
+FOREIGN_KEYS = [
+    ('layover_flight_id_fkey', 'layover'),
+    ('passenger_flight_id_fkey', 'passenger'),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # The referencing and referenced columns must change type together
+    for name, table in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+    for table, column in UUID_COLUMNS:
+        op.alter_column(table, column,
+                        existing_type=sa.String(length=36),
+                        type_=postgresql.UUID(as_uuid=True),
+                        postgresql_using=f'{column}::uuid')
+    for name, table in FOREIGN_KEYS:
+        op.create_foreign_key(name, table, 'flight', ['flight_id'], ['id'])
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for name, table in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+    for table, column in UUID_COLUMNS:
+        op.alter_column(table, column,
+                        existing_type=postgresql.UUID(as_uuid=True),
+                        type_=sa.String(length=36),
+                        postgresql_using=f'{column}::text')
+    for name, table in FOREIGN_KEYS:
+        op.create_foreign_key(name, table, 'flight', ['flight_id'], ['id'])
@@ -1,19 +1,180 @@
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import Column, DateTime
 from sqlalchemy import String
+from sqlalchemy import DDL, event, lambda_stmt, select, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 from sqlalchemy.ext.declarative import declared_attr
 import uuid
-from collections import defaultdict, deque  
+import heapq
+from datetime import datetime
+from collections import defaultdict, namedtuple
+from itertools import chain
+import numpy as np
+
+from numba import njit
+
+# Keep loaded attributes after commit so handlers can serialize without a re-SELECT
+db = SQLAlchemy(session_options={'expire_on_commit': False})
+
+class GUID(TypeDecorator):
+    """uuid.UUID column: native UUID on PostgreSQL, hyphenated VARCHAR(36) elsewhere."""
+    impl = String(36)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(String(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(value)
+        return value if dialect.name == 'postgresql' else str(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(value)
+
+
+# Route search state built from one read of the flight table, swapped into the cache as a unit so
+# the graph, landmark tables and packed arrays a request uses always describe the same table version
+RouteSnapshot = namedtuple('RouteSnapshot', ['version', 'graph', 'landmarks', 'arrays'])
+_graph_cache = {'snapshot': None}
+
+
+def _shortest_costs(graph, source):
+    """Cost of the cheapest path from source to every reachable airport."""
+    costs = {source: 0}
+    queue = [(0, source)]
+    while queue:
+        cost, airport = heapq.heappop(queue)
+        if cost > costs[airport]:
+            continue
+        for destination, edge_cost, _ in graph.get(airport, ()):
+            new_cost = cost + edge_cost
+            if new_cost < costs.get(destination, float('inf')):
+                costs[destination] = new_cost
+                heapq.heappush(queue, (new_cost, destination))
+    return costs
+
+
+def _build_route_arrays(graph, landmarks):
+    """Pack the graph as CSR arrays and the landmark tables as (k, n) cost matrices."""
+    airports = sorted(set(graph).union(*({d for d, _, _ in edges} for edges in graph.values())))
+    index = {airport: i for i, airport in enumerate(airports)}
+    indptr = np.zeros(len(airports) + 1, dtype=np.int64)
+    origins, neighbors, costs, flight_ids = [], [], [], []
+    for i, airport in enumerate(airports):
+        for destination, cost, flight_id in graph.get(airport, ()):
+            origins.append(i)
+            neighbors.append(index[destination])
+            costs.append(cost)
+            flight_ids.append(flight_id)
+        indptr[i + 1] = len(neighbors)
+
+    from_costs = np.full((len(landmarks), len(airports)), np.inf)
+    to_costs = np.full((len(landmarks), len(airports)), np.inf)
+    for row, (landmark_from, landmark_to) in enumerate(landmarks.values()):
+        for airport, cost in landmark_from.items():
+            from_costs[row, index[airport]] = cost
+        for airport, cost in landmark_to.items():
+            to_costs[row, index[airport]] = cost
+
+    return {
+        'index': index,
+        'indptr': indptr,
+        'origins': origins,
+        'neighbors': np.array(neighbors, dtype=np.int64),
+        'costs': np.array(costs, dtype=np.float64),
+        'flight_ids': flight_ids,
+        'from_costs': from_costs,
+        'to_costs': to_costs,
+    }
+
+
+def _landmark_bounds(arrays, dst):
+    """Vectorized ALT lower bound from every airport to dst (inf where dst is unreachable)."""
+    with np.errstate(invalid='ignore'):
+        forward = arrays['from_costs'][:, [dst]] - arrays['from_costs']
+        backward = arrays['to_costs'] - arrays['to_costs'][:, [dst]]
+    # inf - inf gives nan (no information); fmax skips nan
+    bounds = np.fmax(forward, backward)
+    return np.fmax(np.fmax.reduce(bounds, axis=0, initial=0.0), 0.0)
+
+
+@njit(cache=True)
+def _astar_kernel(indptr, neighbors, costs, heuristic, src, dst):
+    """A* over CSR arrays; returns the cost to dst and the edge used to reach each node."""
+    dist = np.full(indptr.shape[0] - 1, np.inf)
+    prev_edge = np.full(indptr.shape[0] - 1, -1, dtype=np.int64)
+    done = np.zeros(indptr.shape[0] - 1, dtype=np.bool_)
+    dist[src] = 0.0
+    queue = [(heuristic[src], 0.0, src)]
+    while len(queue) > 0:
+        _, cost, node = heapq.heappop(queue)
+        if done[node]:
+            continue
+        if node == dst:
+            break
+        done[node] = True
+        for edge in range(indptr[node], indptr[node + 1]):
+            neighbor = neighbors[edge]
+            new_cost = cost + costs[edge]
+            if new_cost < dist[neighbor] and heuristic[neighbor] < np.inf:
+                dist[neighbor] = new_cost
+                prev_edge[neighbor] = edge
+                heapq.heappush(queue, (new_cost + heuristic[neighbor], new_cost, neighbor))
+    return dist[dst], prev_edge
+
+
+def _search_route(arrays, start, end):
+    """A* over the route arrays; returns (flight_ids, total_cost) or (None, inf)."""
+    if start == end:
+        return [], 0
+    index = arrays['index']
+    if start not in index or end not in index:
+        return None, float('inf')
+    src, dst = index[start], index[end]
+
+    heuristic = _landmark_bounds(arrays, dst)
+    total_cost, prev_edge = _astar_kernel(
+        arrays['indptr'], arrays['neighbors'], arrays['costs'], heuristic, np.int64(src), np.int64(dst)
+    )
+    if total_cost == np.inf:
+        return None, float('inf')
+
+    flight_ids = []
+    node = dst
+    while node != src:
+        edge = prev_edge[node]
+        flight_ids.append(arrays['flight_ids'][edge])
+        node = arrays['origins'][edge]
+    flight_ids.reverse()
+    return flight_ids, float(total_cost)
 
-db = SQLAlchemy()
 
 class BaseModel(db.Model):
     __abstract__ = True
+    __mapper_args__ = {'eager_defaults': True}  # Fetch server defaults like created_at in the INSERT
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(GUID(), primary_key=True, default=uuid.uuid4)
     created_at = db.Column(DateTime(timezone=True), server_default=func.now())
     deleted_at = db.Column(DateTime(timezone=True), nullable=True)
+    # Set in Python for sub-second precision, so the flight list ETag changes on every write
+    updated_at = db.Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @validates('id', 'flight_id')
+    def coerce_uuid(self, key, value):
+        """Accept UUID strings but keep uuid.UUID on the instance so identity keys match loaded rows."""
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(value)
 
     def soft_delete(self):
         """Set the deleted_at timestamp to mark as soft deleted."""
@@ -43,8 +204,12 @@ class BaseModel(db.Model):
 
 class Flight(BaseModel, db.Model ):
     __tablename__ = 'flight'
+    __table_args__ = (
+        db.Index('ix_flight_origin_dest', 'origin', 'destination'),
+        db.Index('ix_flight_updated_at', 'updated_at'),  # Backs the max(updated_at) in FLIGHT_TABLE_VERSION
+    )
 
-    id = Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
     flight_name = db.Column(db.String(255), nullable=False)
     origin = db.Column(db.String(255), nullable=False)
     destination = db.Column(db.String(255), nullable=False)
@@ -71,59 +236,100 @@ class Flight(BaseModel, db.Model ):
             total_cost += layover.cost
         return total_cost
     
-    @staticmethod #Dijkstra Algorithm
+    @classmethod
+    def table_version(cls):
+        """(write counter, latest updated_at) of the flight table. ORM writes bump the counter in
+        their own transaction, and writes that bypass the ORM still move the indexed max, so the
+        version changes in every worker process without scanning flight."""
+        return tuple(db.session.execute(FLIGHT_TABLE_VERSION).one())
+
+    @classmethod
+    def route_snapshot(cls):
+        """Return the cached RouteSnapshot, rebuilding it once the committed table version moves."""
+        # Read the version before the rows: a write landing in between only causes an extra rebuild
+        version = cls.table_version()
+        snapshot = _graph_cache['snapshot']
+        if snapshot is None or snapshot.version != version:
+            graph = defaultdict(list)
+            rows = db.session.execute(select(cls.id, cls.origin, cls.destination, cls.cost))
+            for flight_id, origin, destination, cost in rows:
+                if cost < 0:
+                    continue  # Dijkstra/A* need non-negative costs; POST rejects these, skip any legacy rows
+                graph[origin].append((destination, cost, flight_id))
+            graph = dict(graph)
+            landmarks = cls.preprocess_landmarks(graph)
+            snapshot = RouteSnapshot(version, graph, landmarks, _build_route_arrays(graph, landmarks))
+            _graph_cache['snapshot'] = snapshot
+        return snapshot
+
+    @classmethod
+    def route_graph(cls):
+        """Return the cached adjacency list {origin: [(destination, cost, flight_id)]}."""
+        return cls.route_snapshot().graph
+
+    @classmethod
+    def preprocess_landmarks(cls, graph=None, k=8):
+        """Pick up to k landmark airports of graph (the cached route graph by default) by
+        farthest-point sampling and return the cheapest costs from and to each of them for
+        the A* (ALT) heuristic."""
+        if graph is None:
+            graph = cls.route_graph()
+        reverse_graph = defaultdict(list)
+        airports = set(graph)
+        for origin, edges in graph.items():
+            for destination, cost, flight_id in edges:
+                reverse_graph[destination].append((origin, cost, flight_id))
+                airports.add(destination)
+
+        landmarks = {}
+        nearest = dict.fromkeys(airports, float('inf'))  # cost to the closest landmark picked so far
+        candidate = min(airports) if airports else None
+        while candidate is not None and len(landmarks) < k:
+            from_costs = _shortest_costs(graph, candidate)
+            to_costs = _shortest_costs(reverse_graph, candidate)
+            landmarks[candidate] = (from_costs, to_costs)
+            for airport in airports:
+                nearest[airport] = min(
+                    nearest[airport],
+                    from_costs.get(airport, float('inf')),
+                    to_costs.get(airport, float('inf')),
+                )
+            remaining = sorted(airport for airport in airports if airport not in landmarks)
+            candidate = max(remaining, key=nearest.get) if remaining else None
+        return landmarks
+
+    @staticmethod #A* search with landmark (ALT) heuristic
     def find_cheapest_route(start, end):
-        """Find the cheapest route between two destinations using Dijkstra's algorithm."""
+        """Find the cheapest route between two destinations using A* with landmark lower bounds."""
         
-        # Step 1: Build the graph
-        graph = defaultdict(list)
-        flights = Flight.query.all()
-        for flight in flights:
-            graph[flight.origin].append((flight.destination, flight.cost, flight.id))
-
-        # Step 2: Initialize the Dijkstra's algorithm structures
-        min_cost = {start: 0}
-        previous_flight = {}
-        flight_route = {}
-        queue = deque([start])
-
-        while queue:
-            current_airport = queue.popleft()
-
-            for destination, cost, flight_id in graph[current_airport]:
-                new_cost = min_cost[current_airport] + cost
-
-                if destination not in min_cost or new_cost < min_cost[destination]:
-                    min_cost[destination] = new_cost
-                    previous_flight[destination] = current_airport
-                    flight_route[destination] = flight_id
-                    queue.append(destination)
-
-        # Step 3: Construct the cheapest route
-        route = []
-        total_cost = min_cost.get(end, None)
-
-        if total_cost is None: #check if the destination is unreachable
-            return None, float('inf')
-
-        step = end #starts tracing back from the destination to the start
-        while step != start:
-            flight_id = flight_route.get(step)
-            if flight_id:
-                flight = db.session.get(Flight, flight_id)
-                route.insert(0, flight)# adds the flight to the beginning of the route list in reverse order
-                step = previous_flight[step]
-            else:
-                break
-
-        return route, total_cost
+        for attempt in range(2):
+            # Step 1: Get the cached graph, landmark tables and packed arrays from one snapshot
+            snapshot = Flight.route_snapshot()
+
+            # Step 2: Run A* in the compiled kernel over the packed arrays
+            flight_ids, total_cost = _search_route(snapshot.arrays, start, end)
+
+            if flight_ids is None:
+                return None, float('inf')
+
+            # Load all flights on the route in one query
+            flights = db.session.execute(select(Flight).where(Flight.id.in_(flight_ids))).scalars()
+            flights_by_id = {flight.id: flight for flight in flights}
+            if all(flight_id in flights_by_id for flight_id in flight_ids):
+                return [flights_by_id[flight_id] for flight_id in flight_ids], total_cost
+
+            # A flight on the route was deleted after the graph was built; rebuild and search again
+            if _graph_cache['snapshot'] is snapshot:
+                _graph_cache['snapshot'] = None
+
+        return None, float('inf')
     
 class Layover(BaseModel, db.Model):
     __tablename__ = 'layover'
 
     airport = db.Column(db.String(255), nullable=False)
     cost = db.Column(db.Float, nullable=False)
-    flight_id = db.Column(db.String(36), db.ForeignKey('flight.id'))
+    flight_id = db.Column(GUID(), db.ForeignKey('flight.id'))
 
     def to_dict(self):
         base_dict = super().to_dict()
@@ -135,15 +341,47 @@ class Layover(BaseModel, db.Model):
         return base_dict
 
 
+class FlightTableVersion(db.Model):
+    """Single-row counter bumped in the same transaction as every ORM write to the flight table."""
+    __tablename__ = 'flight_table_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+# Migrations seed the row; do the same when the table comes from create_all (tests, development)
+event.listen(
+    FlightTableVersion.__table__, 'after_create',
+    DDL('INSERT INTO flight_table_version (id, version) VALUES (1, 0)'),
+)
+
+FLIGHT_TABLE_VERSION = lambda_stmt(lambda: select(
+    FlightTableVersion.version, select(func.max(Flight.updated_at)).scalar_subquery()
+))
+BUMP_FLIGHT_TABLE_VERSION = update(FlightTableVersion).values(version=FlightTableVersion.version + 1)
+
+@event.listens_for(db.session, 'after_flush')
+def bump_flight_table_version(session, flush_context):
+    if any(isinstance(obj, Flight) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.connection().execute(BUMP_FLIGHT_TABLE_VERSION)
+
+@event.listens_for(db.session, 'do_orm_execute')
+def bump_flight_table_version_on_bulk(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements skip the flush, so bump inside their transaction here
+    mapper = orm_execute_state.bind_mapper
+    if not orm_execute_state.is_select and mapper is not None and mapper.class_ is Flight:
+        orm_execute_state.session.connection().execute(BUMP_FLIGHT_TABLE_VERSION)
+
+
 
 class Passenger(BaseModel, db.Model ):
     __tablename__ = 'passenger'
+    __table_args__ = (db.Index('ix_passenger_deleted_at', 'deleted_at'),)
 
-    id = Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), nullable=False)
     checked_in = db.Column(db.Boolean, default=False)
-    flight_id = db.Column(db.String(36), db.ForeignKey('flight.id'))
+    flight_id = db.Column(GUID(), db.ForeignKey('flight.id'))
     flight = db.relationship('Flight', backref=db.backref('passengers', lazy=True))
 
     def to_dict(self):
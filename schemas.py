@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Annotated
+import msgspec
+
+
+# Request bodies, decoded and type-checked in one pass by msgspec
+
+class FlightIn(msgspec.Struct):
+    flight_name: str
+    origin: str
+    destination: str
+    cost: Annotated[float, msgspec.Meta(ge=0)]  # Route search needs non-negative costs
+    id: str | None = None
+    created_at: datetime | None = None
+    deleted_at: datetime | None = None
+
+
+class PassengerIn(msgspec.Struct):
+    name: str
+    email: str
+    flight_id: str
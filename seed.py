@@ -11,7 +11,7 @@ def seed():
         flights = []
         for _ in range(5):  # Generate flights
             flight = Flight(
-                id=str(uuid.uuid4()),  # Use UUID for primary key and ensure it's a string if needed
+                id=uuid.uuid4(),  # UUID primary key, stored natively on PostgreSQL
                 flight_name=fake.company() + ' Flight',
                 origin=fake.city(),  # Add origin for completeness
                 destination=fake.city(),
@@ -34,7 +34,7 @@ def seed():
         for flight in flights:
             for _ in range(3):  # Generate 3 passengers per flight
                 passenger = Passenger(
-                    id=str(uuid.uuid4()),  # Use UUID for primary key and ensure it's a string if needed
+                    id=uuid.uuid4(),  # UUID primary key, stored natively on PostgreSQL
                     name=fake.name(),
                     email=fake.email(),
                     flight_id=flight.id
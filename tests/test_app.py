@@ -1,12 +1,16 @@
 import pytest
+import json
 import uuid
-from app import app, db
+from app import app, db, cache
 from models import Flight, Passenger
 
+app.config['RAISE_ON_LAZY_LOAD'] = True  # Fail handler tests on N+1 lazy loads
+
 @pytest.fixture(scope='function')
 def setup_db():
     """Fixture to set up and tear down the database."""
     with app.app_context():
+        cache.clear()  # Don't let cached GET responses leak between tests
         db.create_all()  # Create tables before each test
         yield db  # Provide the test access to the db
         db.session.remove()
@@ -31,6 +35,24 @@ def test_get_all_flights(client, clear_flights_db):
     assert response.status_code == 200
     assert response.get_json() == []
 
+def test_get_all_flights_serializes_rows(client, clear_flights_db):
+    """Test that listed flights have the same shape as a single flight."""
+    flight_id = str(uuid.uuid4())
+    flight = Flight(
+        id=flight_id,
+        flight_name='Test Flight',
+        origin='City A',
+        destination='City B',
+        cost=100
+    )
+    db.session.add(flight)
+    db.session.commit()
+
+    response = client.get('/flights')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data == [flight.to_dict()]
+
 def test_post_flight(client):
     """Test posting a new flight."""
     flight_id = str(uuid.uuid4())
@@ -179,3 +201,214 @@ def test_find_cheapest_route(client):
     assert len(data['route']) == 2
     assert data['route'][0]['id'] == flight1_id
     assert data['route'][1]['id'] == flight2_id
+
+def test_get_all_passengers(client):
+    """Test listing passengers excludes soft-deleted ones."""
+    flight_id = str(uuid.uuid4())
+    flight = Flight(
+        id=flight_id,
+        flight_name='Test Flight',
+        origin='City A',
+        destination='City B',
+        cost=100
+    )
+    active = Passenger(name='John Doe', email='johndoe@example.com', flight_id=flight_id)
+    deleted = Passenger(name='Jane Doe', email='janedoe@example.com', flight_id=flight_id)
+    db.session.add_all([flight, active, deleted])
+    db.session.commit()
+    deleted.soft_delete()
+
+    response = client.get('/passengers')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert len(data) == 1
+    assert data[0]['name'] == 'John Doe'
+    assert data[0]['flight_id'] == flight_id
+    assert data == [active.to_dict()]
+
+def test_flight_list_cache_invalidated_on_write(client, clear_flights_db):
+    """Test that a cached flight list is refreshed after a new flight is committed."""
+    response = client.get('/flights')
+    assert response.get_json() == []
+
+    flight_data = {
+        'flight_name': 'Test Flight',
+        'origin': 'City A',
+        'destination': 'City B',
+        'cost': 100
+    }
+    response = client.post('/flights', json=flight_data)
+    assert response.status_code == 201
+
+    response = client.get('/flights')
+    assert response.status_code == 200
+    assert len(response.get_json()) == 1
+
+def test_post_flight_invalid_id(client):
+    """Test that a malformed flight ID is rejected."""
+    flight_data = {
+        'id': 'not-a-uuid',
+        'flight_name': 'Test Flight',
+        'origin': 'City A',
+        'destination': 'City B',
+        'cost': 100
+    }
+    response = client.post('/flights', json=flight_data)
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Invalid flight ID format'
+
+def test_create_passenger_invalid_flight_id(client):
+    """Test that creating a passenger with a malformed or missing flight ID is rejected."""
+    for flight_id in ('not-a-uuid', None):
+        passenger_data = {
+            'name': 'John Doe',
+            'email': 'johndoe@example.com',
+            'flight_id': flight_id
+        }
+        response = client.post('/passengers', json=passenger_data)
+        assert response.status_code == 400
+
+def test_restore_passenger(client):
+    """Test restoring a soft-deleted passenger and the error cases around it."""
+    flight_id = str(uuid.uuid4())
+    passenger_id = str(uuid.uuid4())
+    flight = Flight(
+        id=flight_id,
+        flight_name='Test Flight',
+        origin='City A',
+        destination='City B',
+        cost=100
+    )
+    passenger = Passenger(
+        id=passenger_id,
+        name='John Doe',
+        email='johndoe@example.com',
+        flight_id=flight_id
+    )
+    db.session.add_all([flight, passenger])
+    db.session.commit()
+
+    response = client.patch(f'/passengers/{passenger_id}/restore')
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Passenger is not soft deleted'
+
+    response = client.delete(f'/passengers/{passenger_id}/soft_delete')
+    assert response.status_code == 200
+    assert len(client.get('/passengers').get_json()) == 0
+
+    response = client.patch(f'/passengers/{passenger_id}/restore')
+    assert response.status_code == 200
+    assert response.get_json()['message'] == 'Passenger restored'
+    assert len(client.get('/passengers').get_json()) == 1
+
+    response = client.patch(f'/passengers/{uuid.uuid4()}/restore')
+    assert response.status_code == 404
+
+def test_get_all_flights_conditional(client, clear_flights_db):
+    """Test that the flight list answers If-None-Match with 304 until a flight changes."""
+    response = client.get('/flights')
+    etag = response.headers['ETag']
+    assert etag
+
+    response = client.get('/flights', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+    flight_data = {
+        'flight_name': 'Test Flight',
+        'origin': 'City A',
+        'destination': 'City B',
+        'cost': 100
+    }
+    client.post('/flights', json=flight_data)
+
+    response = client.get('/flights', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert len(response.get_json()) == 1
+
+def test_get_all_flights_stream(client, clear_flights_db):
+    """Test streaming the flight list as NDJSON."""
+    for name in ('Flight 1', 'Flight 2'):
+        db.session.add(Flight(flight_name=name, origin='City A', destination='City B', cost=100))
+    db.session.commit()
+
+    response = client.get('/flights?stream=1')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert sorted(line['flight_name'] for line in lines) == ['Flight 1', 'Flight 2']
+
+def test_post_flight_validation(client):
+    """Test that flight bodies are type-checked and timestamps parsed."""
+    flight_data = {
+        'flight_name': 'Test Flight',
+        'origin': 'City A',
+        'destination': 'City B',
+        'cost': 100,
+        'created_at': '2024-08-25T15:49:39'
+    }
+    response = client.post('/flights', json=flight_data)
+    assert response.status_code == 201
+    assert response.get_json()['created_at'] == '2024-08-25T15:49:39'
+
+    del flight_data['cost']
+    response = client.post('/flights', json=flight_data)
+    assert response.status_code == 400
+
+    flight_data.update(cost=100, created_at='yesterday')
+    response = client.post('/flights', json=flight_data)
+    assert response.status_code == 400
+
+    flight_data.update(cost=-1, created_at=None)
+    response = client.post('/flights', json=flight_data)
+    assert response.status_code == 400
+
+def test_create_passengers_batch(client):
+    """Test creating several passengers in one request."""
+    flight_id = str(uuid.uuid4())
+    flight = Flight(
+        id=flight_id,
+        flight_name='Test Flight',
+        origin='City A',
+        destination='City B',
+        cost=100
+    )
+    db.session.add(flight)
+    db.session.commit()
+
+    passengers_data = [
+        {'name': 'John Doe', 'email': 'johndoe@example.com', 'flight_id': flight_id},
+        {'name': 'Jane Doe', 'email': 'janedoe@example.com', 'flight_id': flight_id},
+    ]
+    response = client.post('/passengers/batch', json=passengers_data)
+    assert response.status_code == 201
+    data = response.get_json()
+    assert [passenger['name'] for passenger in data] == ['John Doe', 'Jane Doe']
+    assert all(passenger['flight_id'] == flight_id and passenger['created_at'] for passenger in data)
+    assert len(client.get('/passengers').get_json()) == 2
+
+    passengers_data[1]['flight_id'] = str(uuid.uuid4())
+    response = client.post('/passengers/batch', json=passengers_data)
+    assert response.status_code == 404
+
+def test_soft_delete_passenger_visible_in_same_session(client):
+    """Test that a passenger loaded before a soft delete reflects it afterwards."""
+    flight = Flight(flight_name='Test Flight', origin='City A', destination='City B', cost=100)
+    passenger = Passenger(name='John Doe', email='johndoe@example.com', flight=flight)
+    db.session.add_all([flight, passenger])
+    db.session.commit()
+
+    client.delete(f'/passengers/{passenger.id}/soft_delete')
+    response = client.get(f'/passengers/{passenger.id}')
+    assert response.get_json()['deleted_at'] is not None
+
+def test_passenger_cache_invalidated_on_write(client):
+    """Test that a cached passenger is refreshed after an update is committed."""
+    flight = Flight(flight_name='Test Flight', origin='City A', destination='City B', cost=100)
+    passenger = Passenger(name='John Doe', email='johndoe@example.com', flight=flight)
+    db.session.add_all([flight, passenger])
+    db.session.commit()
+
+    assert client.get(f'/passengers/{passenger.id}').get_json()['name'] == 'John Doe'
+    client.put(f'/passengers/{passenger.id}', json={'name': 'Jane Doe'})
+    assert client.get(f'/passengers/{passenger.id}').get_json()['name'] == 'Jane Doe'
@@ -179,3 +179,188 @@ def test_find_cheapest_route(client):
         assert len(route) == 2
         assert route[0].id == flight1.id
         assert route[1].id == flight2.id
+
+def test_find_cheapest_route_sees_new_flights(client):
+    """Test that the cached route graph is rebuilt after a flight is added."""
+    with app.app_context():
+        flight1 = Flight(
+            flight_name='Flight 1',
+            origin='City A',
+            destination='City C',
+            cost=200.0
+        )
+        db.session.add(flight1)
+        db.session.commit()
+
+        route, total_cost = Flight.find_cheapest_route('City A', 'City C')
+        assert total_cost == 200.0
+
+        flight2 = Flight(
+            flight_name='Flight 2',
+            origin='City A',
+            destination='City C',
+            cost=80.0
+        )
+        db.session.add(flight2)
+        db.session.commit()
+
+        route, total_cost = Flight.find_cheapest_route('City A', 'City C')
+        assert total_cost == 80.0
+        assert [flight.id for flight in route] == [flight2.id]
+
+def test_find_cheapest_route_unreachable(client):
+    """Test that an unreachable destination returns no route."""
+    with app.app_context():
+        flight = Flight(
+            flight_name='Flight 1',
+            origin='City A',
+            destination='City B',
+            cost=100.0
+        )
+        db.session.add(flight)
+        db.session.commit()
+
+        route, total_cost = Flight.find_cheapest_route('City B', 'City A')
+        assert route is None
+        assert total_cost == float('inf')
+
+def test_find_cheapest_route_with_landmarks(client):
+    """Test that A* with landmarks still finds the cheapest of several routes."""
+    with app.app_context():
+        legs = [
+            ('City A', 'City B', 10.0),
+            ('City B', 'City D', 100.0),
+            ('City A', 'City C', 30.0),
+            ('City C', 'City D', 30.0),
+            ('City D', 'City E', 5.0),
+            ('City E', 'City A', 1.0),
+        ]
+        flights = [
+            Flight(flight_name=f'Flight {i}', origin=origin, destination=destination, cost=cost)
+            for i, (origin, destination, cost) in enumerate(legs)
+        ]
+        db.session.add_all(flights)
+        db.session.commit()
+
+        landmarks = Flight.preprocess_landmarks(k=2)
+        assert len(landmarks) == 2
+
+        route, total_cost = Flight.find_cheapest_route('City A', 'City E')
+        assert total_cost == 65.0
+        assert [flight.id for flight in route] == [flights[2].id, flights[3].id, flights[4].id]
+
+        route, total_cost = Flight.find_cheapest_route('City B', 'City C')
+        assert total_cost == 136.0
+
+def test_route_search_kernel(client):
+    """Test that the compiled A* kernel finds the cheapest route and handles unreachable ends."""
+    from models import _astar_kernel, _build_route_arrays, _search_route
+
+    with app.app_context():
+        legs = [
+            ('City A', 'City B', 10.0),
+            ('City B', 'City D', 100.0),
+            ('City A', 'City C', 30.0),
+            ('City C', 'City D', 30.0),
+        ]
+        flights = [
+            Flight(flight_name=f'Flight {i}', origin=origin, destination=destination, cost=cost)
+            for i, (origin, destination, cost) in enumerate(legs)
+        ]
+        db.session.add_all(flights)
+        db.session.commit()
+
+        arrays = _build_route_arrays(Flight.route_graph(), Flight.preprocess_landmarks(k=2))
+        assert _search_route(arrays, 'City A', 'City D') == ([flights[2].id, flights[3].id], 60.0)
+        assert _search_route(arrays, 'City D', 'City A') == (None, float('inf'))
+        assert _search_route(arrays, 'City A', 'City A') == ([], 0)
+        assert _astar_kernel.signatures  # Ran through numba, not the Python fallback
+
+def test_find_cheapest_route_stale_graph(client, monkeypatch):
+    """Test that a route through a flight deleted behind the cache's back is rebuilt, not a KeyError."""
+    with app.app_context():
+        direct = Flight(flight_name='Direct', origin='City A', destination='City C', cost=50.0)
+        via_b = [
+            Flight(flight_name='Leg 1', origin='City A', destination='City B', cost=60.0),
+            Flight(flight_name='Leg 2', origin='City B', destination='City C', cost=60.0),
+        ]
+        db.session.add_all([direct, *via_b])
+        db.session.commit()
+
+        route, total_cost = Flight.find_cheapest_route('City A', 'City C')
+        assert [flight.id for flight in route] == [direct.id]
+
+        # Pretend the table version didn't change, as a cache in another process could see it
+        version = Flight.table_version()
+        monkeypatch.setattr(Flight, 'table_version', classmethod(lambda cls: version))
+        db.session.delete(direct)
+        db.session.commit()
+
+        route, total_cost = Flight.find_cheapest_route('City A', 'City C')
+        assert total_cost == 120.0
+        assert [flight.id for flight in route] == [flight.id for flight in via_b]
+
+def test_flight_table_version_bumped_by_writes(client):
+    """Test that flight inserts, deletes and bulk deletes move the table version and rollbacks don't."""
+    with app.app_context():
+        versions = [Flight.table_version()]
+        flight = Flight(flight_name='Flight 1', origin='City A', destination='City B', cost=10.0)
+        db.session.add(flight)
+        db.session.commit()
+        versions.append(Flight.table_version())
+        db.session.delete(flight)
+        db.session.commit()
+        versions.append(Flight.table_version())
+        assert len(set(versions)) == 3
+
+        db.session.add(Flight(flight_name='Flight 2', origin='City A', destination='City B', cost=10.0))
+        db.session.commit()
+        version = Flight.table_version()
+        Flight.query.delete()
+        db.session.rollback()
+        assert Flight.table_version() == version
+        Flight.query.delete()
+        db.session.commit()
+        assert Flight.table_version() != version
+
+def test_find_cheapest_route_concurrent_write(client, monkeypatch):
+    """Test that a flight committed while a route search is running can't mix graph snapshots."""
+    with app.app_context():
+        db.session.add(Flight(flight_name='Flight 1', origin='City A', destination='City B', cost=10.0))
+        db.session.commit()
+
+        read_version = Flight.table_version
+        calls = []
+
+        def write_before_second_read(cls):
+            calls.append(None)
+            if len(calls) == 2:  # Another worker commits after the first version and rows were read
+                with db.engine.begin() as connection:
+                    connection.execute(Flight.__table__.insert(), [
+                        {'flight_name': 'Flight 2', 'origin': 'City A', 'destination': 'City B', 'cost': 1.0},
+                        {'flight_name': 'Flight 3', 'origin': 'City B', 'destination': 'City Z', 'cost': 5.0},
+                    ])
+            return read_version()
+
+        monkeypatch.setattr(Flight, 'table_version', classmethod(write_before_second_read))
+        route, total_cost = Flight.find_cheapest_route('City A', 'City Z')
+        assert route is None  # City Z didn't exist in the snapshot this search used
+
+        # Later searches see the new flights instead of landmarks/arrays stuck on the old graph
+        route, total_cost = Flight.find_cheapest_route('City A', 'City Z')
+        assert total_cost == 6.0
+        route, total_cost = Flight.find_cheapest_route('City A', 'City B')
+        assert total_cost == 1.0
+        assert [flight.flight_name for flight in route] == ['Flight 2']
+
+def test_find_cheapest_route_skips_negative_costs(client):
+    """Test that a negative-cost flight row doesn't break route search for everyone."""
+    with app.app_context():
+        db.session.add_all([
+            Flight(flight_name='Flight 1', origin='City A', destination='City B', cost=100.0),
+            Flight(flight_name='Bad Flight', origin='City C', destination='City D', cost=-5.0),
+        ])
+        db.session.commit()
+
+        route, total_cost = Flight.find_cheapest_route('City A', 'City B')
+        assert total_cost == 100.0